@@ -1,13 +1,13 @@
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from scrapy.selector import Selector
-from urllib.parse import urlparse, urljoin
-from concurrent.futures import ThreadPoolExecutor
+from playwright.async_api import async_playwright
+from urllib.parse import urlsplit, urljoin
+import ahocorasick
+import asyncio
+import io
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
-import time
-from webdriver_manager.chrome import ChromeDriverManager
 
 # Excluded domains and patterns (including social media and common footer links)
 EXCLUDED_WEBSITES = [
@@ -17,105 +17,119 @@ EXCLUDED_WEBSITES = [
 ]
 EXCLUDED_PATTERNS = ['#', '/contact', '/privacy', '/terms']
 
-# Initialize Selenium WebDriver
-def init_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--ignore-certificate-errors")  # Ignore SSL certificate errors
+# One Aho-Corasick automaton over every excluded token: a single linear walk
+# of the URL replaces ~20 substring probes per link
+_EXCLUDED_AUTOMATON = ahocorasick.Automaton()
+for _token in EXCLUDED_WEBSITES + EXCLUDED_PATTERNS:
+    _EXCLUDED_AUTOMATON.add_word(_token, _token)
+_EXCLUDED_AUTOMATON.make_automaton()
 
-    chrome_driver_path = ChromeDriverManager().install()
-    return webdriver.Chrome(service=Service(chrome_driver_path), options=options)
-
-# Extract outgoing links from a single webpage
-def extract_links_from_page(url):
-    outgoing_links = set()
-    driver = None
+# Fetch all anchor hrefs from one page using a context on the shared browser
+async def fetch_links(browser, url):
+    context = await browser.new_context(ignore_https_errors=True)
     try:
-        driver = init_driver()
-        driver.get(url)
-        time.sleep(3)  # Allow page to load fully
-
-        page_source = driver.page_source
-        selector = Selector(text=page_source)
-        anchor_tags = selector.css('a::attr(href)').getall()
-
-        parsed_url = urlparse(url)
-        main_domain = parsed_url.netloc.replace('www.', '')
-
-        for link in anchor_tags:
-            full_url = urljoin(url, link)  # Convert relative URLs to absolute
-            parsed_link = urlparse(full_url)
-            domain = parsed_link.netloc.replace('www.', '')
-
-            # Exclude main domain, subdomains, and predefined domains
-            if (
-                domain
-                and main_domain not in domain
-                and not any(excluded in domain for excluded in EXCLUDED_WEBSITES)
-                and not any(pattern in full_url for pattern in EXCLUDED_PATTERNS)
-            ):
-                outgoing_links.add(f"https://{domain}/")
-    except Exception as e:
-        st.warning(f"Error processing {url}: {e}")
+        page = await context.new_page()
+        await page.goto(url, wait_until='networkidle', timeout=15000)
+        return await page.eval_on_selector_all('a', 'els => els.map(e => e.href)')
     finally:
-        if driver:
-            driver.quit()
+        await context.close()
 
-    return list(outgoing_links)
+# Keep only external links, applying the exclusion rules
+def filter_outgoing_links(url, anchor_tags):
+    outgoing_links = set()
+    main_domain = urlsplit(url).netloc.replace('www.', '')
 
-# Process URLs concurrently
-def process_urls_concurrently(urls):
-    all_outgoing_links = {}
-    with ThreadPoolExecutor(max_workers=5) as executor:  # Adjust thread count for performance
-        future_to_url = {executor.submit(extract_links_from_page, url): url for url in urls}
-        for future in future_to_url:
-            url = future_to_url[future]
-            try:
-                all_outgoing_links[url] = future.result()
-            except Exception as e:
-                st.warning(f"Error processing {url}: {e}")
-    return all_outgoing_links
+    for link in anchor_tags:
+        full_url = urljoin(url, link)  # Convert relative URLs to absolute
+        domain = urlsplit(full_url).netloc.replace('www.', '')
 
-# Save results to a CSV file
-def save_to_csv(results):
-    timestamp = int(time.time())
-    filename = f"outgoing_links_{timestamp}.csv"
+        # Exclude main domain, subdomains, and predefined domains/patterns
+        if (
+            domain
+            and main_domain not in domain
+            and next(_EXCLUDED_AUTOMATON.iter(full_url), None) is None
+        ):
+            outgoing_links.add(f"https://{domain}/")
 
-    rows = []
-    for base_url, links in results.items():
-        for link in links:
-            rows.append({"Base URL": base_url, "Outgoing Link": link})
+    return list(outgoing_links)
 
-    df = pd.DataFrame(rows)
-    df.to_csv(filename, index=False)
-    return filename
+async def _fetch_all_links(urls):
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        try:
+            pages = await asyncio.gather(
+                *[fetch_links(browser, url) for url in urls],
+                return_exceptions=True,
+            )
+        finally:
+            await browser.close()
 
-# Save results to an Excel file
-def save_to_excel(results):
-    timestamp = int(time.time())
-    filename = f"outgoing_links_{timestamp}.xlsx"
+    all_outgoing_links = {}
+    for url, anchor_tags in zip(urls, pages):
+        if isinstance(anchor_tags, BaseException):
+            st.warning(f"Error processing {url}: {anchor_tags}")
+        else:
+            all_outgoing_links[url] = filter_outgoing_links(url, anchor_tags)
+    return all_outgoing_links
 
-    rows = []
+# Process URLs concurrently: one event loop drives every page load over a
+# single browser's CDP connection, so parallelism isn't capped by threads
+def process_urls_concurrently(urls):
+    return asyncio.run(_fetch_all_links(urls))
+
+# Flatten results into preallocated columns so pandas gets whole columns
+# instead of a list of per-row dicts (which costs an extra copy)
+def _flatten_results(results):
+    total = sum(len(links) for links in results.values())
+    base_col = [None] * total
+    link_col = [None] * total
+    i = 0
     for base_url, links in results.items():
         for link in links:
-            rows.append({"Base URL": base_url, "Outgoing Link": link})
-
-    df = pd.DataFrame(rows)
-    
-    # Save as Excel
-    with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
+            base_col[i] = base_url
+            link_col[i] = link
+            i += 1
+    return base_col, link_col
+
+# Flatten once and memoize: every output format shares this DataFrame, and
+# Streamlit reruns main() on each widget interaction
+@st.cache_data
+def build_links_df(results):
+    base_col, link_col = _flatten_results(results)
+    return pd.DataFrame({"Base URL": base_col, "Outgoing Link": link_col}, copy=False)
+
+# Download payloads are built in memory (and memoized) rather than written
+# to timestamped files: Streamlit reruns main() on every widget interaction,
+# which used to leave a new pair of files on disk per click
+
+# Parquet payload: columnar, zstd-compressed, written zero-copy from Arrow
+# buffers — far cheaper than building an xlsx workbook
+@st.cache_data
+def links_parquet_bytes(df):
+    buf = io.BytesIO()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, buf, compression='zstd')
+    return buf.getvalue()
+
+# CSV payload
+@st.cache_data
+def links_csv_bytes(df):
+    return df.to_csv(index=False).encode()
+
+# Excel payload
+@st.cache_data
+def links_excel_bytes(df):
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine='xlsxwriter') as writer:
         df.to_excel(writer, index=False, sheet_name='Outgoing Links')
         workbook = writer.book
         worksheet = writer.sheets['Outgoing Links']
-        
+
         # Add formatting for better readability
         worksheet.set_column('A:A', 30)  # Set column width for Base URL
         worksheet.set_column('B:B', 50)  # Set column width for Outgoing Link
         worksheet.freeze_panes(1, 0)  # Freeze the header row
-    return filename
+    return buf.getvalue()
 
 # Streamlit Web App
 def main():
@@ -168,45 +182,54 @@ def main():
 
         # Start progress spinner
         with st.spinner("Fetching outgoing links... This might take a while."):
-            results = process_urls_concurrently(urls)
-
-        if results:
-            st.success("Processing complete!")
-            st.subheader("Outgoing Links by Website:")
-
-            # Display results dynamically
-            for idx, (base_url, links) in enumerate(results.items()):
-                st.write(f"### {base_url}")
-                st.text_area(
-                    "Outgoing Links",
-                    value="\n".join(links),
-                    height=200,
-                    key=f"links_{idx}"  # Unique key for each text area
-                )
-
-            # Save to CSV and Excel, and provide download links
-            csv_file = save_to_csv(results)
-            excel_file = save_to_excel(results)
-
-            # Provide download links for CSV and Excel
-            with open(csv_file, "rb") as file:
-                st.download_button(
-                    label="Download CSV",
-                    data=file,
-                    file_name=csv_file,
-                    mime="text/csv"
-                )
-            
-            with open(excel_file, "rb") as file:
-                st.download_button(
-                    label="Download Excel",
-                    data=file,
-                    file_name=excel_file,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-        else:
+            # Keep results in session state so download buttons (which
+            # rerun the script) don't lose them
+            st.session_state["link_results"] = process_urls_concurrently(urls)
+
+        if not st.session_state["link_results"]:
             st.warning("No outgoing links found.")
-    else:
+
+    results = st.session_state.get("link_results")
+    if results:
+        st.success("Processing complete!")
+        st.subheader("Outgoing Links by Website:")
+
+        # Display results dynamically
+        for idx, (base_url, links) in enumerate(results.items()):
+            st.write(f"### {base_url}")
+            st.text_area(
+                "Outgoing Links",
+                value="\n".join(links),
+                height=200,
+                key=f"links_{idx}"  # Unique key for each text area
+            )
+
+        # Parquet and CSV are cheap to build; xlsx is the most expensive
+        # output format, so it is only generated when explicitly requested
+        links_df = build_links_df(results)
+
+        st.download_button(
+            label="Download Parquet",
+            data=links_parquet_bytes(links_df),
+            file_name="outgoing_links.parquet",
+            mime="application/octet-stream"
+        )
+
+        st.download_button(
+            label="Download CSV",
+            data=links_csv_bytes(links_df),
+            file_name="outgoing_links.csv",
+            mime="text/csv"
+        )
+
+        if st.button("Prepare Excel download"):
+            st.download_button(
+                label="Download Excel",
+                data=links_excel_bytes(links_df),
+                file_name="outgoing_links.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+    elif not submit_button:
         st.warning("Please upload a file or enter URLs.")
 
 if __name__ == "__main__":